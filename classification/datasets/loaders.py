@@ -4,13 +4,12 @@ import urllib.parse
 from functools import partial
 
 import pandas as pd
-from sklearn.model_selection import train_test_split
+import pyarrow as pa
+import pyarrow.csv as pv
 from sklearn.preprocessing import LabelEncoder
-import numpy as np
 from scipy.io import arff
 
-from utils import Dataset
-from config import TEST_SIZE, RANDOM_STATE
+from utils import Dataset, cache_split, split_dataset
 from config import DEFAULT_DATA_DIR
 
 
@@ -35,6 +34,7 @@ class RetinopathyDataset(Dataset):
         return df.drop(columns=["class"]), df.loc[:, "class"]
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
@@ -42,9 +42,7 @@ class RetinopathyDataset(Dataset):
         data, _ = arff.loadarff(dataset_path)
         df = pd.DataFrame(data)
         X, y = cls.preprocess(df)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -56,17 +54,30 @@ class DefaultCreditCardDataset(Dataset):
     is_metric_maximized = True
 
     @classmethod
+    def download(cls, workdir):
+        super().download(workdir)
+        cls.convert_to_parquet(workdir)
+
+    @classmethod
+    def convert_to_parquet(cls, workdir):
+        # Parsing the Excel file is slow, it is done only once
+        dataset_path = os.path.join(workdir, cls.filename)
+        # First header row (X1, ..., X23, Y) is skipped, second one has feature names
+        df = pd.read_excel(dataset_path, header=1)
+        df.to_parquet(dataset_path + ".parquet", compression="snappy")
+
+    @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
             cls.download(workdir)
-        df = pd.read_excel(dataset_path, header=[0, 1])
-        y = df["Y"][df["Y"].columns[0]]
-        X = df[[f"X{i}" for i in range(1, 24)]]
-        X.columns = X.columns.droplevel()
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        elif not isfile(dataset_path + ".parquet"):
+            cls.convert_to_parquet(workdir)
+        df = pd.read_parquet(dataset_path + ".parquet")
+        y = df["default payment next month"]
+        X = df.drop(columns=["ID", "default payment next month"])
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -78,17 +89,16 @@ class BreastCancerDataset(Dataset):
     is_metric_maximized = True
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
             cls.download(workdir)
-        df = pd.read_csv(dataset_path, header=None)
+        df = pd.read_csv(dataset_path, header=None, memory_map=True)
         X = df[df.columns[1:-1]]
         X = X.apply(partial(pd.to_numeric, errors="coerce"))  # replace '?' by NaN
         y = (df[df.columns[-1]] == 4).astype(int)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -100,16 +110,15 @@ class StatlogAustralianDataset(Dataset):
     is_metric_maximized = True
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
             cls.download(workdir)
-        df = pd.read_csv(dataset_path, sep=" ", header=None)
+        df = pd.read_csv(dataset_path, sep=" ", header=None, memory_map=True)
         y = df[df.columns[-1]]
         X = df[df.columns[:-1]]
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -121,16 +130,17 @@ class StatlogGermanDataset(Dataset):
     categorical_features = []  # already encoded
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
             cls.download(workdir)
-        df = pd.read_csv(dataset_path, delim_whitespace=True, header=None)
+        df = pd.read_csv(
+            dataset_path, delim_whitespace=True, header=None, memory_map=True
+        )
         y = (df[df.columns[-1]] == 2).astype(int)
         X = df[df.columns[:-1]]
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -146,17 +156,21 @@ class SteelPlatesFaultsDataset(Dataset):
 
     @classmethod
     def get(cls, workdir=DEFAULT_DATA_DIR):
-        dataset_path = os.path.join(workdir, cls.filenames[0])
-        if not isfile(dataset_path):
+        if not all(map(isfile, cls.get_raw_filepaths(workdir))):
             cls.download(workdir)
-        df = pd.read_csv(dataset_path, sep="\t", header=None)
 
-        dataset_path = os.path.join(workdir, cls.filenames[1])
-        if not isfile(dataset_path):
-            cls.download(workdir)
-        with open(dataset_path, "r") as f:
+        # Read outside of the cached split so that it is also set on cache hits
+        with open(os.path.join(workdir, cls.filenames[1]), "r") as f:
             cls.feature_names = f.read().strip().split("\n")
 
+        return cls.get_split(workdir)
+
+    @classmethod
+    @cache_split
+    def get_split(cls, workdir):
+        dataset_path = os.path.join(workdir, cls.filenames[0])
+        df = pd.read_csv(dataset_path, sep="\t", header=None, memory_map=True)
+
         X = df[df.columns[:27]]
         y = df[df.columns[27:]]
 
@@ -164,9 +178,7 @@ class SteelPlatesFaultsDataset(Dataset):
         y.columns = range(7)
         y = y.idxmax(axis=1)
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -209,15 +221,16 @@ class AdultDataset(Dataset):
     is_metric_maximized = True
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         df_train, df_test = cls.get_raw(workdir)
         X_train, y_train = cls.parse_dataset(df_train)
         X_test, y_test = cls.parse_dataset(df_test)
 
-        le = LabelEncoder().fit(y_train)
-        y_train = le.transform(y_train)
-        y_test = y_test.str[:-1]  # Additional . at the end of labels in test
-        y_test = le.transform(y_test)
+        labels = {"<=50K": 0, ">50K": 1}
+        y_train = y_train.map(labels).astype("int8")
+        # Additional . at the end of labels in test
+        y_test = y_test.str.rstrip(".").map(labels).astype("int8")
 
         return (X_train, y_train), (X_test, y_test)
 
@@ -226,22 +239,35 @@ class AdultDataset(Dataset):
         dataset_path = os.path.join(workdir, cls.filenames[0])
         if not isfile(dataset_path):
             cls.download(workdir)
-        df_train = pd.read_csv(
-            os.path.join(workdir, cls.filenames[0]),
-            header=None,
-            skiprows=1,
-            sep=", ",
-            engine="python",
-        )
-        df_test = pd.read_csv(
-            os.path.join(workdir, cls.filenames[1]),
-            header=None,
-            skiprows=1,
-            sep=", ",
-            engine="python",
-        )
+        df_train = cls.read_csv(os.path.join(workdir, cls.filenames[0]))
+        df_test = cls.read_csv(os.path.join(workdir, cls.filenames[1]))
         return df_train, df_test
 
+    @classmethod
+    def read_csv(cls, path):
+        # Numerical features are all integers
+        column_types = {
+            f"f{i}": pa.int32()
+            for i, name in enumerate(cls.feature_names)
+            if name not in cls.categorical_features
+        }
+        with pa.memory_map(path) as file:
+            table = pv.read_csv(
+                file,
+                read_options=pv.ReadOptions(
+                    skip_rows=1, autogenerate_column_names=True
+                ),
+                parse_options=pv.ParseOptions(delimiter=","),
+                convert_options=pv.ConvertOptions(column_types=column_types),
+            )
+        df = table.to_pandas()
+        df.columns = range(len(df.columns))
+
+        # Values are separated by ", "
+        for col in df.select_dtypes(exclude="number").columns:
+            df[col] = df[col].str.lstrip()
+        return df
+
     @classmethod
     def parse_dataset(cls, df):
         X, y = df[df.columns[:14]], df[df.columns[14]]
@@ -257,20 +283,21 @@ class YeastDataset(Dataset):
     categorical_features = []
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
             cls.download(workdir)
-        df = pd.read_csv(dataset_path, delim_whitespace=True, header=None)
+        df = pd.read_csv(
+            dataset_path, delim_whitespace=True, header=None, memory_map=True
+        )
         df = df.drop_duplicates()
 
         X = df[df.columns[1:-1]]
         y = df[df.columns[-1]]
         y = LabelEncoder().fit_transform(y)
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -303,6 +330,7 @@ class ThoraricSurgeryDataset(Dataset):
         return X, y
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
@@ -311,9 +339,7 @@ class ThoraricSurgeryDataset(Dataset):
         df = pd.DataFrame(data)
         X, y = cls.preprocess(df)
 
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
 
 
@@ -325,6 +351,7 @@ class SeismicBumpsDataset(Dataset):
     is_metric_maximized = True
 
     @classmethod
+    @cache_split
     def get(cls, workdir=DEFAULT_DATA_DIR):
         dataset_path = os.path.join(workdir, cls.filename)
         if not isfile(dataset_path):
@@ -333,14 +360,13 @@ class SeismicBumpsDataset(Dataset):
         df = pd.DataFrame(data)
         df["class"] = pd.to_numeric(df["class"])
 
-        str_df = df.select_dtypes([np.object])
-        str_df = str_df.stack().str.decode("utf-8").unstack()
-        for col in str_df:
-            df[col] = str_df[col]
+        decoded_columns = {
+            col: df[col].str.decode("utf-8")
+            for col in df.select_dtypes([object]).columns
+        }
+        df = df.assign(**decoded_columns)
 
         X = df.drop(columns=["class"])
         y = df.loc[:, "class"]
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
-        )
+        X_train, X_test, y_train, y_test = split_dataset(X, y)
         return (X_train, y_train), (X_test, y_test)
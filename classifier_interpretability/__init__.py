@@ -111,7 +111,9 @@ def prepare_model():
     train_data, test_data = model.prepare_dataset(
         train, test, dataset.categorical_features
     )
-    tuning_results = get_tuning_results(dataset, model)
+    tuning_results = get_tuning_results(
+        joinpath(RESULTS_DIR, dataset.__name__, model.__name__)
+    )
     estimator = model.build_estimator(tuning_results["hp"], train_data)
 
     estimator.initialize()
@@ -131,7 +133,9 @@ def show_decision_tree_visualizations():
         train, test, dataset.categorical_features
     )
 
-    tuning_results = get_tuning_results(dataset, model)
+    tuning_results = get_tuning_results(
+        joinpath(RESULTS_DIR, dataset.__name__, model.__name__)
+    )
     estimator = model.build_estimator(tuning_results["hp"], train_data)
     estimator.fit(*train_data)
 
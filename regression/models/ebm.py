@@ -7,6 +7,9 @@ import numpy as np
 
 
 class ExplainableBoostingMachineModel(TreeBasedModel):
+    # EBM bins features in float64, float32 would add a copy and move bin edges
+    features_dtype = np.float64
+
     @staticmethod
     def build_estimator(args, train_data=None):
         feature_names = [f"featur_{i}" for i in range(train_data[0].shape[1])]
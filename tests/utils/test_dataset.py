@@ -0,0 +1,65 @@
+from utils import Dataset, cache_split
+import utils.dataset
+import os
+from os import makedirs
+from os.path import isdir, join as joinpath
+from shutil import rmtree
+import pandas as pd
+
+workdir = "test-workdir"
+if isdir(workdir):
+    rmtree(workdir)
+
+
+class DummyDataset(Dataset):
+    n_get_calls = 0
+
+    @classmethod
+    @cache_split
+    def get(cls, workdir):
+        cls.n_get_calls += 1
+        makedirs(workdir, exist_ok=True)
+        X = pd.DataFrame({0: [1.0, 2.0, 3.0, 4.0], 1: ["a", "b", "a", "b"]})
+        y = pd.Series([0, 1, 0, 1])
+        return (X[:3], y[:3]), (X[3:], y[3:])
+
+
+def test_cache_split():
+    (X_train, y_train), (X_test, y_test) = DummyDataset.get(workdir)
+    assert DummyDataset.n_get_calls == 1
+
+    # Check in-process cache
+    DummyDataset.get(workdir)
+    assert DummyDataset.n_get_calls == 1
+
+    # Check on-disk cache
+    utils.dataset._split_cache.clear()
+    (X_train_2, y_train_2), (X_test_2, y_test_2) = DummyDataset.get(workdir)
+    assert DummyDataset.n_get_calls == 1
+    assert X_train.equals(X_train_2) and X_test.equals(X_test_2)
+    assert y_train.equals(y_train_2) and y_test.equals(y_test_2)
+
+
+def test_download_all():
+    source_dir = os.path.abspath(joinpath(workdir, "source"))
+    makedirs(source_dir, exist_ok=True)
+    for filename in ("a.data", "b.data", "c.data"):
+        with open(joinpath(source_dir, filename), "w") as file:
+            file.write(filename)
+
+    class DatasetA(Dataset):
+        filename = "a.data"
+        url = "file://" + joinpath(source_dir, "a.data")
+
+    class DatasetBC(Dataset):
+        filenames = ["b.data", "c.data"]
+        urls = ["file://" + joinpath(source_dir, name) for name in filenames]
+
+    class DatasetWithoutUrl(Dataset):
+        pass
+
+    data_dir = joinpath(workdir, "data")
+    Dataset.download_all([DatasetA, DatasetBC, DatasetWithoutUrl], data_dir)
+    for filename in ("a.data", "b.data", "c.data"):
+        with open(joinpath(data_dir, filename), "r") as file:
+            assert file.read() == filename
@@ -0,0 +1,100 @@
+from utils.training import save_evaluation_results, cached_evaluation, hash_data
+import utils.training
+from os import makedirs
+from os.path import isdir, join as joinpath
+from shutil import rmtree
+import json
+import pandas as pd
+
+workdir = "test-workdir"
+if isdir(workdir):
+    rmtree(workdir)
+
+
+class DummyDataset:
+    metric = "accuracy"
+    is_metric_maximized = True
+    categorical_features = ["b"]
+
+
+def check_written_evaluation_results(hp, score, val_score):
+    with open(joinpath(workdir, "evaluation.json"), "r") as file:
+        written_data = json.load(file)
+    assert written_data["hp"] == hp
+    assert written_data["score"] == score
+    assert written_data["val_score"] == val_score
+
+
+def test_save_evaluation_results():
+    makedirs(workdir, exist_ok=True)
+    tuning_results = {
+        "hp": {"a": 1, "b": "a longer value"},
+        "score": 0.5,
+        "n_trials": 15,
+    }
+
+    # Check saves results
+    save_evaluation_results(workdir, DummyDataset, tuning_results, 0.4, 1.5, 0.1)
+    check_written_evaluation_results(tuning_results["hp"], 0.4, 0.5)
+
+    # Check does not save results if lower validation score
+    lower_tuning_results = dict(tuning_results, score=0.3)
+    save_evaluation_results(workdir, DummyDataset, lower_tuning_results, 0.6, 1.5, 0.1)
+    check_written_evaluation_results(tuning_results["hp"], 0.4, 0.5)
+
+    # Check overwrite results if better validation score, with shorter content
+    better_tuning_results = dict(tuning_results, hp={"a": 3}, score=0.7)
+    save_evaluation_results(workdir, DummyDataset, better_tuning_results, 0.6, 1.5, 0.1)
+    check_written_evaluation_results({"a": 3}, 0.6, 0.7)
+
+
+class DummyModel:
+    pass
+
+
+class Cifar10CustomModel:
+    pass
+
+
+def test_cached_evaluation(monkeypatch):
+    monkeypatch.setattr(utils.training, "RESULTS_DIR", workdir)
+    makedirs(joinpath(workdir, ".cache"), exist_ok=True)
+    evaluations = []
+
+    def evaluate_model(model, dataset, train, test, hyperparams):
+        evaluations.append(hyperparams)
+        return 0.4, 1.5, 0.1
+
+    X = pd.DataFrame({"a": [1.0, 2.0, 3.0, 4.0], "b": ["x", "y", "x", "y"]})
+    y = pd.Series([0, 1, 0, 1])
+    train, test = (X[:3], y[:3]), (X[3:], y[3:])
+    data_hash = hash_data((*train, *test))
+
+    def evaluate(model, hyperparams, data_hash=data_hash):
+        return cached_evaluation(
+            evaluate_model, model, DummyDataset, train, test, hyperparams, data_hash
+        )
+
+    # Check first call evaluates and second call uses the cache
+    assert evaluate(DummyModel, {"a": 1}) == (0.4, 1.5, 0.1)
+    assert evaluate(DummyModel, {"a": 1}) == (0.4, 1.5, 0.1)
+    assert len(evaluations) == 1
+
+    # Check different hyper-parameters or data are evaluated again
+    evaluate(DummyModel, {"a": 2})
+    assert len(evaluations) == 2
+    evaluate(DummyModel, {"a": 1}, hash_data((X[:3], y[:3], X[2:], y[2:])))
+    assert len(evaluations) == 3
+    X_renamed = X.rename(columns={"a": "c"})
+    evaluate(DummyModel, {"a": 1}, hash_data((X_renamed[:3], y[:3], *test)))
+    assert len(evaluations) == 4
+
+    # Check different metric is evaluated again
+    monkeypatch.setattr(DummyDataset, "metric", "f1")
+    evaluate(DummyModel, {"a": 1})
+    assert len(evaluations) == 5
+
+    # Check Cifar10CustomModel is always evaluated
+    evaluate(Cifar10CustomModel, {"a": 1})
+    evaluate(Cifar10CustomModel, {"a": 1})
+    assert len(evaluations) == 7
@@ -1,14 +1,72 @@
 import os
+import shutil
+import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 from os import makedirs
-from os.path import isfile
+from os.path import isfile, getmtime
 
 import numpy as np
 import pandas as pd
 from scipy.io import arff
+from sklearn.model_selection import train_test_split
+
+from config import DEFAULT_DATA_DIR, TEST_SIZE, RANDOM_STATE
+
+_split_cache = {}
+
+
+def cache_split(get):
+    """ Cache the train/test split returned by a dataset get method, in memory and
+        in a pickle file next to the raw dataset files, so that parsing and splitting
+        are only done once
+    """
+
+    @wraps(get)
+    def cached_get(cls, workdir=DEFAULT_DATA_DIR):
+        key = (cls, workdir)
+        if key not in _split_cache:
+            cache_path = os.path.join(
+                workdir,
+                f"{cls.__name__}_ts{TEST_SIZE}_rs{RANDOM_STATE}"
+                f"_v{cls.split_cache_version}.pkl",
+            )
+            raw_filepaths = filter(isfile, cls.get_raw_filepaths(workdir))
+            raw_files_mtime = max(map(getmtime, raw_filepaths), default=0)
+            # Raw files downloaded again after the split was cached invalidate it
+            if isfile(cache_path) and getmtime(cache_path) >= raw_files_mtime:
+                _split_cache[key] = pd.read_pickle(cache_path)
+            else:
+                _split_cache[key] = get(cls, workdir)
+                pd.to_pickle(_split_cache[key], cache_path)
+        return _split_cache[key]
+
+    return cached_get
+
+
+def split_dataset(X, y):
+    """ Stratified train/test split shared by the classification datasets """
+    train_index, test_index = train_test_split(
+        np.arange(len(X)), test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+
+    def take(data, index):
+        return data.iloc[index] if hasattr(data, "iloc") else data[index]
+
+    return (
+        take(X, train_index),
+        take(X, test_index),
+        take(y, train_index),
+        take(y, test_index),
+    )
 
 
 class Dataset:
+    # To be increased in a dataset class when the output of its loader changes,
+    # to invalidate the train/test split cached on disk
+    split_cache_version = 1
+
     @classmethod
     def download(cls, workdir):
         makedirs(workdir, exist_ok=True)
@@ -22,10 +80,36 @@ class Dataset:
         else:
             raise ValueError("No dataset URL specified")
 
+    @staticmethod
+    def download_all(datasets, workdir=DEFAULT_DATA_DIR):
+        # Datasets sharing the same files (e.g. Facebook metrics) are downloaded once
+        datasets_to_download = {}
+        for dataset in datasets:
+            filepaths = tuple(dataset.get_raw_filepaths(workdir))
+            if filepaths and not all(map(isfile, filepaths)):
+                datasets_to_download.setdefault(filepaths, dataset)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            downloads = [
+                executor.submit(dataset.download, workdir)
+                for dataset in datasets_to_download.values()
+            ]
+            for download in downloads:
+                download.result()  # raise download errors
+
+    @classmethod
+    def get_raw_filepaths(cls, workdir):
+        if hasattr(cls, "url"):
+            return [os.path.join(workdir, cls.filename)]
+        elif hasattr(cls, "urls"):
+            return [os.path.join(workdir, filename) for filename in cls.filenames]
+        return []
+
     @staticmethod
     def download_file(url, filepath):
-        url = url.replace(" ", "%20")
-        urllib.request.urlretrieve(url, filepath)
+        url = urllib.parse.quote(url, safe=":/")
+        with urllib.request.urlopen(url) as response, open(filepath, "wb") as file:
+            shutil.copyfileobj(response, file, length=1 << 20)  # 1 MiB chunks
 
     @classmethod
     def get_min_k_fold_k_value(cls, train_data):
@@ -12,6 +12,9 @@ from config import RANDOM_STATE
 
 
 class TreeBasedModel:
+    # sklearn trees convert features to float32 internally
+    features_dtype = np.float32
+
     @classmethod
     def prepare_dataset(cls, train_data, test_data, categorical_features):
         # Ensure original data is not modified
@@ -47,9 +50,20 @@ class TreeBasedModel:
             X_train_enc = imp.fit_transform(X_train_enc)
             X_test_enc = imp.transform(X_test_enc)
 
+        # Tree building goes through features column by column while prediction goes
+        # through examples row by row
+        X_train_enc = as_dtype(X_train_enc, cls.features_dtype, order="F")
+        X_test_enc = as_dtype(X_test_enc, cls.features_dtype, order="C")
+
         return (X_train_enc, y_train, *other), (X_test_enc, y_test)
 
 
+def as_dtype(X, dtype, order):
+    if scipy.sparse.issparse(X):
+        return X.astype(dtype)
+    return np.asarray(X, dtype=dtype, order=order)
+
+
 class NonTreeBasedModel:
     @classmethod
     def prepare_dataset(cls, train_data, test_data, categorical_features):
@@ -80,4 +94,9 @@ class NonTreeBasedModel:
             X_train_enc = imp.fit_transform(X_train_enc)
             X_test_enc = imp.transform(X_test_enc)
 
+        # Linear models, kernels and neural networks go through examples row by row,
+        # scaling keeps the Fortran order of DataFrame.values for numeric-only data
+        X_train_enc = np.ascontiguousarray(X_train_enc)
+        X_test_enc = np.ascontiguousarray(X_test_enc)
+
         return (X_train_enc, y_train, *other), (X_test_enc, y_test)
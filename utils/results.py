@@ -1,4 +1,6 @@
-from glob import glob
+import os
+from os.path import join as joinpath, isfile
+from pathlib import Path
 from config import RESULTS_DIR
 import json
 import re
@@ -7,31 +9,49 @@ from classification import datasets as clf_ds
 from regression import datasets as reg_ds
 from utils.critical_difference_diagram import draw_cd_diagram
 
+try:
+    import orjson  # faster JSON parsing if available
+except ImportError:
+    orjson = None
 
-def get_results_table():
-    result_files = glob("results/*/*/evaluation.json")
+name_pattern = re.compile(r"[a-zA-Z0-9]+")
+
+
+def find_result_files():
+    for dataset_dir in os.scandir(RESULTS_DIR):
+        if not dataset_dir.is_dir() or not name_pattern.fullmatch(dataset_dir.name):
+            continue
+        for model_dir in os.scandir(dataset_dir.path):
+            if not model_dir.is_dir() or not name_pattern.fullmatch(model_dir.name):
+                continue
+            result_file = joinpath(model_dir.path, "evaluation.json")
+            if isfile(result_file):
+                yield dataset_dir.name, model_dir.name, result_file
 
-    pattern = re.compile(
-        RESULTS_DIR + r"/([a-zA-Z0-9]+)/([a-zA-Z0-9]+)/evaluation.json"
-    )
-    result_table = []
-
-    for result_file in result_files:
-        dataset, model = pattern.match(result_file).groups()
-        with open(result_file, "r") as file:
-            results = json.load(file)
-        results["hp"] = ",".join(
-            [
-                f"{k}={v}" if type(v) in [str, list, type(None)] else f"{k}={v:.2f}"
-                for k, v in results["hp"].items()
-            ]
-        )
-        results.update({"dataset": dataset, "model": model})
-        result_table.append(results)
 
-    result_table = pd.DataFrame(result_table)
-    result_table = result_table[
+def load_json(path):
+    content = Path(path).read_bytes()
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def format_hyperparams(hyperparams):
+    return ",".join(
         [
+            f"{k}={v}" if type(v) in [str, list, type(None)] else f"{k}={v:.2f}"
+            for k, v in hyperparams.items()
+        ]
+    )
+
+
+def get_results_table():
+    result_table = [
+        {**load_json(result_file), "dataset": dataset, "model": model}
+        for dataset, model, result_file in find_result_files()
+    ]
+
+    result_table = pd.DataFrame.from_records(
+        result_table,
+        columns=[
             "dataset",
             "model",
             "score",
@@ -40,8 +60,9 @@ def get_results_table():
             "evaluation_time",
             "tuning_n_trials",
             "hp",
-        ]
-    ]
+        ],
+    )
+    result_table["hp"] = result_table["hp"].apply(format_hyperparams)
     return result_table
 
 
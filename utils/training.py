@@ -1,38 +1,59 @@
 from glob import glob
+import hashlib
+import inspect
 import json
+import os
+import pickle
 import re
 import time
 import warnings
 from os import makedirs
 from os.path import join as joinpath, isfile
 
+import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.exceptions import ConvergenceWarning
 
 from config import RESULTS_DIR
-from utils import compute_loss, compute_metric
+from utils import Dataset, compute_loss, compute_metric
 from .timeout import set_timeout, TimeoutError
 
+# To be increased to invalidate cached evaluation results after a change of
+# evaluate_model or of code it uses outside of the model classes
+EVALUATION_CACHE_VERSION = 1
+
 
 def train_all_models_on_all_datasets(datasets, models, max_training_time=180):
     warnings.filterwarnings("ignore", category=ConvergenceWarning)
     evaluate_model_with_timeout = set_timeout(evaluate_model, max_training_time)
+    Dataset.download_all(datasets)
+    makedirs(joinpath(RESULTS_DIR, ".cache"), exist_ok=True)
     for dataset in datasets:
         print(f"Dataset: {dataset.__name__}")
         train, test = dataset.get()
+        data_hash = hash_data((*train, *test))
+        dataset_results_dir = joinpath(RESULTS_DIR, dataset.__name__)
         for model in models:
             print(f"Model: {model.__name__}")
+            results_dir = joinpath(dataset_results_dir, model.__name__)
             try:
                 try:
-                    tuning_results = get_tuning_results(dataset, model)
+                    tuning_results = get_tuning_results(results_dir)
                 except FileNotFoundError:
                     print("No hyper-parameters saved for this dataset and model")
                     continue
 
                 try:
                     hyperparams = tuning_results["hp"]
-                    score, train_time, evaluation_time = evaluate_model_with_timeout(
-                        model, dataset, train, test, hyperparams
+                    score, train_time, evaluation_time = cached_evaluation(
+                        evaluate_model_with_timeout,
+                        model,
+                        dataset,
+                        train,
+                        test,
+                        hyperparams,
+                        data_hash,
                     )
                 except TimeoutError:
                     print(
@@ -44,7 +65,12 @@ def train_all_models_on_all_datasets(datasets, models, max_training_time=180):
                     continue
 
                 save_evaluation_results(
-                    dataset, model, tuning_results, score, train_time, evaluation_time
+                    results_dir,
+                    dataset,
+                    tuning_results,
+                    score,
+                    train_time,
+                    evaluation_time,
                 )
 
                 print(
@@ -63,7 +89,7 @@ def evaluate_model(model, dataset, train, test, hyperparams):
     is_cifar_model = model.__name__ == "Cifar10CustomModel"
     cifar_model_weights_path = joinpath(RESULTS_DIR, "Cifar10CustomModel-weights.pkl")
 
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     train_data, test_data = model.prepare_dataset(
         train, test, dataset.categorical_features
     )
@@ -76,59 +102,117 @@ def evaluate_model(model, dataset, train, test, hyperparams):
         train_time = -1
     else:
         X, y, *_ = train_data
+        # Memory layout of the features is chosen by model.prepare_dataset
         estimator.fit(X, y)
-        train_time = time.time() - start_time
+        train_time = (time.perf_counter_ns() - start_time) * 1e-9
         if is_cifar_model:
             estimator.save_params(f_params=cifar_model_weights_path)
 
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     X_test, y_test = test_data
     metric_value = compute_metric(y_test, estimator.predict(X_test), dataset.metric)
     score = -compute_loss(dataset.metric, [metric_value])
-    evaluation_time = time.time() - start_time
+    evaluation_time = (time.perf_counter_ns() - start_time) * 1e-9
 
     return score, train_time, evaluation_time
 
 
-def get_tuning_results(dataset, model):
-    tuning_results_dir = joinpath(RESULTS_DIR, dataset.__name__, model.__name__)
+def hash_data(arrays):
+    data_hash = hashlib.sha1()
+    for array in arrays:
+        if isinstance(array, (pd.DataFrame, pd.Series)):
+            # Categorical features are selected by column name
+            if isinstance(array, pd.DataFrame):
+                data_hash.update(repr(list(array.columns)).encode())
+            # One hash per row, index included
+            data_hash.update(pd.util.hash_pandas_object(array).values)
+        elif isinstance(array, np.ndarray) and array.dtype != object:
+            data_hash.update(f"{array.dtype}{array.shape}".encode())
+            data_hash.update(np.ascontiguousarray(array))
+        else:
+            data_hash.update(pickle.dumps(array))
+    return data_hash.hexdigest()
+
+
+def cached_evaluation(
+    evaluate_model_fct, model, dataset, train, test, hyperparams, data_hash
+):
+    """ Evaluation results are cached on disk for each combination of dataset, metric,
+        categorical features, model, hyper-parameters, data and code version
+    """
+    # Evaluating the Cifar10 model also saves its weights, it cannot be skipped
+    if model.__name__ == "Cifar10CustomModel":
+        return evaluate_model_fct(model, dataset, train, test, hyperparams)
+
+    key = hashlib.sha1()
+    key.update(f"{dataset.__name__}/{model.__name__}/{data_hash}/".encode())
+    # Used by evaluate_model, the order of the categorical features gives the order
+    # of the encoded columns
+    key.update(f"{dataset.metric}/{dataset.categorical_features!r}/".encode())
+    key.update(json.dumps(hyperparams, sort_keys=True).encode())
+    key.update(get_code_version(model).encode())
+    cache_path = joinpath(RESULTS_DIR, ".cache", key.hexdigest()[:16] + ".json")
+
+    if isfile(cache_path):
+        print("Using cached evaluation results")
+        with open(cache_path, "r", encoding="utf-8") as file:
+            return tuple(json.load(file))
+
+    results = evaluate_model_fct(model, dataset, train, test, hyperparams)
+    with open(cache_path, "w", encoding="utf-8") as file:
+        json.dump(results, file)
+    return results
+
+
+def get_code_version(model):
+    # Source of the model and its base classes (prepare_dataset, build_estimator)
+    sources = [inspect.getsource(cls) for cls in model.__mro__ if cls is not object]
+    return "/".join(
+        [
+            str(EVALUATION_CACHE_VERSION),
+            sklearn.__version__,
+            np.__version__,
+            pd.__version__,
+            *sources,
+        ]
+    )
 
-    with open(
-        joinpath(tuning_results_dir, "tuning.json"), "r", encoding="utf-8"
-    ) as file:
+
+def get_tuning_results(results_dir):
+    with open(joinpath(results_dir, "tuning.json"), "r", encoding="utf-8") as file:
         prev_results = json.load(file)
         return prev_results
 
 
 def save_evaluation_results(
-    dataset, model, tuning_results, score, train_time, evaluation_time
+    results_dir, dataset, tuning_results, score, train_time, evaluation_time
 ):
-    results_dir = joinpath(RESULTS_DIR, dataset.__name__, model.__name__)
-    makedirs(results_dir, exist_ok=True)
+    # results_dir already exists since tuning results have been read from it
+    results_path = joinpath(results_dir, "evaluation.json")
 
-    try:
-        with open(
-            joinpath(results_dir, "evaluation.json"), "r", encoding="utf-8"
-        ) as file:
+    # Previous results are read and overwritten through the same file handle
+    with open(
+        results_path, "r+" if isfile(results_path) else "w+", encoding="utf-8"
+    ) as file:
+        if os.fstat(file.fileno()).st_size > 0:
             prev_results = json.load(file)
             if dataset.is_metric_maximized:
                 better_val_results = tuning_results["score"] > prev_results["val_score"]
             else:
                 better_val_results = tuning_results["score"] < prev_results["val_score"]
-    except FileNotFoundError:
-        better_val_results = True
-
-    if better_val_results:
-        results = {
-            "hp": tuning_results["hp"],
-            "score": score,
-            "tuning_n_trials": tuning_results["n_trials"],
-            "val_score": tuning_results["score"],
-            "train_time": train_time,
-            "evaluation_time": evaluation_time,
-            "metric_used": dataset.metric,
-        }
-        with open(
-            joinpath(results_dir, "evaluation.json"), "w", encoding="utf-8"
-        ) as file:
+        else:
+            better_val_results = True
+
+        if better_val_results:
+            results = {
+                "hp": tuning_results["hp"],
+                "score": score,
+                "tuning_n_trials": tuning_results["n_trials"],
+                "val_score": tuning_results["score"],
+                "train_time": train_time,
+                "evaluation_time": evaluation_time,
+                "metric_used": dataset.metric,
+            }
+            file.seek(0)
             json.dump(results, file, ensure_ascii=False, indent=4)
+            file.truncate()
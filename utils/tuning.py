@@ -14,7 +14,7 @@ from sklearn.model_selection import GroupKFold, KFold, StratifiedKFold
 from sklearn.utils import shuffle
 
 from config import K_FOLD_K_VALUE, RANDOM_STATE, RESULTS_DIR
-from utils import compute_loss, compute_metric
+from utils import Dataset, compute_loss, compute_metric
 from .timeout import set_timeout, TimeoutError
 
 
@@ -32,6 +32,7 @@ def tune_all_models_on_all_datasets(
 
     minimum_runtime = max_tuning_time * len(models) * len(datasets)
     print(f"Expected minimum runtime: {timedelta(seconds=minimum_runtime)}")
+    Dataset.download_all(datasets)
 
     for dataset in datasets:
         print(f"Dataset: {dataset.__name__}")